@@ -15,6 +15,8 @@ Setup Instructions:
 2. Create an Azure Face API resource, and obtain the Endpoint and Subscription Key.
 3. Run the script from the command line:
    python ImageRenamer.py <directory_path> [--DATE] [--COMPRESS] [--HASH]
+   python ImageRenamer.py --DAEMON [--DATE] [--COMPRESS] [--HASH]
+   The --DAEMON argument keeps the captioning model loaded and processes each directory path read from stdin.
 
 Supported Image Formats: .jpg, .jpeg, .jfif, .png, .bmp, .gif, .webp, .heic
 """
@@ -24,6 +26,7 @@ import sys
 import re
 import shutil
 import hashlib
+import functools
 from datetime import datetime
 from PIL import Image, ExifTags
 from pillow_heif import register_heif_opener
@@ -43,13 +46,16 @@ MAX_RESOLUTION = (1920, 1080)
 # Register HEIF/HEIC format with Pillow
 register_heif_opener()
 
-# Initialize the BLIP model and processor for image captioning
-processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
-
 # Set up your Azure Face API credentials
 face_client = FaceClient(FACE_API_ENDPOINT, CognitiveServicesCredentials(FACE_API_KEY))
 
+@functools.lru_cache(maxsize=1)
+def get_blip():
+    """Load the BLIP processor and captioning model on first use and reuse them for the life of the process."""
+    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
+    model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+    return processor, model
+
 def log_message(message, log_directory):
     """Log a message with a timestamp to a specified log file in the target directory."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -148,6 +154,7 @@ def generate_caption(image_path, log_directory):
     """Generate a caption for an image using the BLIP model."""
     try:
         image = Image.open(image_path).convert("RGB")
+        processor, model = get_blip()
         inputs = processor(image, return_tensors="pt")
         out = model.generate(**inputs)
         caption = processor.decode(out[0], skip_special_tokens=True)
@@ -184,14 +191,21 @@ def get_date_taken(metadata, log_directory):
         log_message(f"Error extracting date taken from metadata: {e}", log_directory=log_directory)
         return None
 
-def resolve_conflict(directory, base_name, fileext):
-    """Resolve naming conflicts by appending a numeric suffix to the base name."""
+def get_directory_listing(directory_listings, directory):
+    """Return a cached snapshot of a directory's filenames, normalized for the platform's case sensitivity."""
+    if directory not in directory_listings:
+        directory_listings[directory] = {os.path.normcase(name) for name in os.listdir(directory)}
+    return directory_listings[directory]
+
+def resolve_conflict(directory_listings, directory, base_name, fileext):
+    """Resolve naming conflicts by appending a numeric suffix to the base name, probing a cached directory listing."""
+    existing_names = get_directory_listing(directory_listings, directory)
     counter = 1
-    while True:
-        new_filename = f"{base_name}{counter:03d}{fileext}"
-        if not os.path.exists(os.path.join(directory, new_filename)):
-            return new_filename
+    while os.path.normcase(f"{base_name}{counter:03d}{fileext}") in existing_names:
         counter += 1
+    new_filename = f"{base_name}{counter:03d}{fileext}"
+    existing_names.add(os.path.normcase(new_filename))
+    return new_filename
 
 def convert_heic_files(directory, originals_folder, log_directory):
     """Convert all HEIC files in the directory to JPG while preserving metadata."""
@@ -204,6 +218,7 @@ def convert_heic_files(directory, originals_folder, log_directory):
 
 def generate_captions(directory, originals_folder, log_directory):
     """Generate captions for all image files in the directory."""
+    directory_listings = {}
     for root, _, files in os.walk(directory):
         for file in files:
             fileext = os.path.splitext(file)[1].lower()
@@ -217,7 +232,7 @@ def generate_captions(directory, originals_folder, log_directory):
                     pascal_case_name = "".join(
                         word.capitalize() for word in caption.split()
                     )[:47]
-                    new_name = resolve_conflict(root, pascal_case_name, fileext)
+                    new_name = resolve_conflict(directory_listings, root, pascal_case_name, fileext)
                     try:
                         os.rename(image_path, os.path.join(root, new_name))
                         move_to_originals(image_path, originals_folder, log_directory)
@@ -285,6 +300,25 @@ if __name__ == "__main__":
     compress = "--COMPRESS" in sys.argv
     hashimages = "--HASH" in sys.argv
 
+    if "--DAEMON" in sys.argv:
+        # Load the model once, then process each directory path read from stdin until EOF
+        get_blip()
+        for line in sys.stdin:
+            directory = line.strip()
+            if not directory:
+                continue
+            if not os.path.isdir(directory):
+                print(f"Error: The provided directory '{directory}' does not exist.", flush=True)
+                continue
+            # Report a failed directory and keep serving the rest instead of ending the worker
+            try:
+                process_images(directory, prepend_date, compress, hashimages)
+            except Exception as e:
+                print(f"Error: Failed to process '{directory}': {e}", flush=True)
+                continue
+            print(f"Processed {directory}", flush=True)
+        sys.exit(0)
+
     # Get the directory from the command-line argument if provided
     if len(sys.argv) > 1:
         directory = sys.argv[1]
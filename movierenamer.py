@@ -9,9 +9,13 @@ taken to the filename. Logging is performed in the target directory.
 
 Setup Instructions:
 1. Install required packages:
-   pip install moviepy transformers opencv-python requests
+   pip install moviepy av numpy transformers torch opencv-python requests
+   (Optional: bitsandbytes to load the captioning model with 8-bit weights on a low-VRAM CUDA GPU; set GPU_INT8 = True)
+   (Optional: optimum for BetterTransformer attention on transformers versions without SDPA support for BLIP)
 2. Run the script from the command line:
    python MovieRenamer.py <directory_path> [--DATE] [--COMPRESS]
+   python MovieRenamer.py --DAEMON [--DATE] [--COMPRESS]
+   The --DAEMON argument keeps the captioning model loaded and processes each directory path read from stdin.
 
 Supported Video Formats: .mp4, .mov
 """
@@ -20,28 +24,194 @@ import os
 import sys
 import re
 import shutil
+import logging
+import subprocess
+import functools
+import itertools
+import threading
+import importlib.util
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+import av
+import numpy as np
+import torch
+from moviepy.config import get_setting
 from moviepy.editor import VideoFileClip
 from PIL import Image
-from transformers import BlipProcessor, BlipForConditionalGeneration
+from transformers import BlipProcessor, BlipForConditionalGeneration, BitsAndBytesConfig
 
 # Global Constants
 SUPPORTED_EXTENSIONS = [".mp4", ".mov"]
 LOG_FILENAME = "MovieRenamer_Log.txt"
 JPEG_QUALITY = 70
 MAX_RESOLUTION = (1920, 1080)
+CAPTION_BATCH_SIZE = 32
+CAPTION_FRAME_SIZE = 384  # BLIP's input resolution; its processor resizes every frame to this square anyway
+MAX_WORKERS = os.cpu_count() or 1  # Keyframe decoding threads
+MAX_ENCODE_WORKERS = 2  # Concurrent MoviePy encodes; each ffmpeg already uses every core and holds full-size frames
+MP4_AUDIO_CODECS = {"aac", "mp3", "alac"}  # Audio codecs that can be stream-copied into an MP4 container
+CAPTION_MAX_NEW_TOKENS = 20  # Captions are cut to 47 characters once PascalCased, so longer generations are wasted
+# Image tokens merged away in each BLIP vision encoder layer. Off by default: merging averages tokens without
+# ToMe's size weighting or proportional attention, so enable it only after comparing captions with the unmerged model
+TOKEN_MERGE_R = 0
+BLIP_MODEL_NAME = "Salesforce/blip-image-captioning-base"
+GPU_INT8 = False  # Load 8-bit weights with bitsandbytes on CUDA; slower than FP16 and not compiled, so only for low-VRAM cards
 
-# Initialize the BLIP model and processor for image captioning
-processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+# Run captioning on the GPU in half precision when CUDA is available
+device = "cuda" if torch.cuda.is_available() else "cpu"
+dtype = torch.float16 if device == "cuda" else torch.float32
+
+def load_blip_with_fused_attention(**kwargs):
+    """Load BLIP with fused scaled-dot-product attention, falling back to BetterTransformer or the eager model."""
+    try:
+        return BlipForConditionalGeneration.from_pretrained(BLIP_MODEL_NAME, attn_implementation="sdpa", **kwargs)
+    except (ValueError, ImportError):
+        # Older torch/transformers versions, or BLIP builds without an SDPA attention path
+        model = BlipForConditionalGeneration.from_pretrained(BLIP_MODEL_NAME, **kwargs)
+    try:
+        from optimum.bettertransformer import BetterTransformer
+        return BetterTransformer.transform(model)
+    except Exception:
+        return model
+
+def load_caption_model():
+    """Load the BLIP captioning model in FP16 on CUDA (8-bit if GPU_INT8 is set) or with int8 linear layers on CPU."""
+    if device == "cuda":
+        if GPU_INT8 and importlib.util.find_spec("bitsandbytes") is not None:
+            # bitsandbytes stores the linear layers as int8 and keeps the remaining layers in FP16
+            return load_blip_with_fused_attention(
+                torch_dtype=dtype,
+                quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+                device_map="auto",
+            ).eval()
+        return load_blip_with_fused_attention(torch_dtype=dtype).to(device).eval()
+    # On CPU, fall back to PyTorch's dynamic int8 quantization of the linear layers
+    model = load_blip_with_fused_attention(torch_dtype=dtype).eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def merge_tokens(hidden_states, r):
+    """Merge the r most similar pairs of image tokens by bipartite soft matching, keeping the CLS token intact."""
+    cls_token, tokens = hidden_states[:, :1], hidden_states[:, 1:]
+    r = min(r, tokens.shape[1] // 2)
+    if r <= 0:
+        return hidden_states
+
+    # Split tokens into alternating sets A and B and match each A token to its most similar B token
+    metric = tokens / tokens.norm(dim=-1, keepdim=True)
+    scores = metric[:, ::2] @ metric[:, 1::2].transpose(-1, -2)
+    node_max, node_idx = scores.max(dim=-1)
+    edge_idx = node_max.argsort(dim=-1, descending=True)[..., None]
+    unmerged_idx, src_idx = edge_idx[:, r:], edge_idx[:, :r]
+    dst_idx = node_idx[..., None].gather(dim=1, index=src_idx)
+
+    # Average the r best-matched A tokens into their B partners and keep the rest of A as-is
+    channels = tokens.shape[-1]
+    src, dst = tokens[:, ::2], tokens[:, 1::2]
+    unmerged = src.gather(dim=1, index=unmerged_idx.expand(-1, -1, channels))
+    src = src.gather(dim=1, index=src_idx.expand(-1, -1, channels))
+    dst = dst.scatter_reduce(1, dst_idx.expand(-1, -1, channels), src, reduce="mean")
+    return torch.cat([cls_token, unmerged, dst], dim=1)
+
+def apply_token_merging(vision_model, r):
+    """Patch each vision encoder layer to merge r redundant image tokens after it runs (training-free ToMe)."""
+    if r <= 0:
+        return
+
+    def merging_forward(layer_forward, *args, **kwargs):
+        outputs = layer_forward(*args, **kwargs)
+        if isinstance(outputs, tuple):
+            return (merge_tokens(outputs[0], r),) + outputs[1:]
+        return merge_tokens(outputs, r)
+
+    for layer in vision_model.encoder.layers:
+        layer.forward = functools.partial(merging_forward, layer.forward)
+
+# One logger per log directory, each keeping its log file open between messages; only the
+# MAX_OPEN_LOGS most recently used directories keep a file open
+MAX_OPEN_LOGS = 16
+loggers = OrderedDict()
+loggers_lock = threading.Lock()
+
+# Serializes moves into the ORIGINALS folder so concurrent workers cannot pick the same destination name
+originals_lock = threading.Lock()
+
+def warm_up_caption_model(processor, model):
+    """Caption one blank frame so CUDA context setup and kernel selection are not charged to the first video."""
+    inputs = processor(images=Image.new("RGB", (384, 384)), return_tensors="pt").to(device, dtype)
+    with torch.inference_mode():
+        model.generate(**inputs, num_beams=1, do_sample=False, max_new_tokens=CAPTION_MAX_NEW_TOKENS)
+
+def compile_caption_model(processor, model):
+    """Compile the BLIP vision encoder and text decoder with torch.compile, paying the compile cost on a dummy frame.
+
+    Returns True if the compiled model is in place and warmed up.
+    """
+    if device != "cuda" or getattr(model, "is_loaded_in_8bit", False) or not hasattr(torch, "compile"):
+        return False
+    vision_model = model.vision_model
+    # The vision encoder sees fixed-size frames, so CUDA graphs apply; the decoder's sequence length grows every step
+    model.vision_model = torch.compile(vision_model, mode="reduce-overhead")
+    model.text_decoder.forward = torch.compile(model.text_decoder.forward, dynamic=True)
+    try:
+        warm_up_caption_model(processor, model)
+        return True
+    except Exception as e:
+        # Keep the eager model if this torch build or the quantized layers cannot be compiled
+        print(f"torch.compile unavailable for the captioning model, continuing without it: {e}", file=sys.stderr)
+        model.vision_model = vision_model
+        del model.text_decoder.forward
+        return False
+
+@functools.lru_cache(maxsize=1)
+def get_blip():
+    """Load the BLIP processor and captioning model on first use and reuse them for the life of the process."""
+    processor = BlipProcessor.from_pretrained(BLIP_MODEL_NAME)
+    model = load_caption_model()
+    apply_token_merging(model.vision_model, TOKEN_MERGE_R)
+    if device == "cuda" and not compile_caption_model(processor, model):
+        warm_up_caption_model(processor, model)
+    return processor, model
+
+def close_logger(logger):
+    """Flush and close a logger's log file. Callers hold loggers_lock."""
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+
+def get_logger(log_directory):
+    """Return the logger for a target directory, keeping at most MAX_OPEN_LOGS log files open. Callers hold loggers_lock."""
+    log_path = os.path.abspath(os.path.join(log_directory, LOG_FILENAME))
+    if log_path in loggers:
+        loggers.move_to_end(log_path)
+        return loggers[log_path]
+    # Close the least recently used log file so large trees do not exhaust file descriptors
+    if len(loggers) >= MAX_OPEN_LOGS:
+        _, oldest_logger = loggers.popitem(last=False)
+        close_logger(oldest_logger)
+    logger = logging.getLogger(f"MovieRenamer:{log_path}")
+    handler = logging.FileHandler(log_path, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    loggers[log_path] = logger
+    return logger
+
+def close_loggers():
+    """Flush and close every open log file."""
+    with loggers_lock:
+        for logger in loggers.values():
+            close_logger(logger)
+        loggers.clear()
 
 def log_message(message, log_directory):
     """Log a message with a timestamp to a specified log file in the target directory."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_path = os.path.join(log_directory, LOG_FILENAME)
     try:
-        with open(log_path, "a", encoding="utf-8") as log_file:
-            log_file.write(f"[{timestamp}] {message}\n")
+        # Hold the lock while writing so another thread cannot close this log file mid-message
+        with loggers_lock:
+            get_logger(log_directory).info(message)
     except Exception as e:
         print(f"Error writing to log file: {e}")
 
@@ -64,23 +234,68 @@ def move_to_originals(file_path, originals_folder, log_directory):
         extension = os.path.splitext(file_path)[1]
         dest_path = os.path.join(originals_folder, os.path.basename(file_path))
 
-        # If the file already exists in the ORIGINALS folder, append a timestamp
-        if os.path.exists(dest_path):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            new_base_name = f"{base_name}_{timestamp}"
-            dest_path = os.path.join(originals_folder, new_base_name + extension)
+        with originals_lock:
+            # If the file already exists in the ORIGINALS folder, append a timestamp, plus a counter
+            # when several same-named files arrive within the same second
+            if os.path.exists(dest_path):
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                new_base_name = f"{base_name}_{timestamp}"
+                dest_path = os.path.join(originals_folder, new_base_name + extension)
+                counter = 1
+                while os.path.exists(dest_path):
+                    dest_path = os.path.join(originals_folder, f"{new_base_name}_{counter}{extension}")
+                    counter += 1
 
-        shutil.move(file_path, dest_path)
+            shutil.move(file_path, dest_path)
         log_message(f"Moved {file_path} to {dest_path}", log_directory=log_directory)
     except Exception as e:
         log_message(f"Error moving {file_path} to {originals_folder}: {e}", log_directory=log_directory)
 
+def temp_audio_path(output_path):
+    """Return a temporary audio track path beside the output, so parallel MoviePy writes never share one.
+
+    MoviePy otherwise names the file after the output's basename in the working directory,
+    which collides when same-named videos from different folders are written at once.
+    """
+    return os.path.splitext(output_path)[0] + "TEMP_MPY_wvf_snd.m4a"
+
+def probe_codecs(video_path):
+    """Return the codec names of a file's first video and audio streams, using None where a stream is missing or unreadable."""
+    try:
+        with av.open(video_path) as container:
+            video_codec = container.streams.video[0].codec_context.name if container.streams.video else None
+            audio_codec = container.streams.audio[0].codec_context.name if container.streams.audio else None
+            return video_codec, audio_codec
+    except Exception:
+        return None, None
+
+def remux_mov_to_mp4(video_path, mp4_path, log_directory):
+    """Copy an H.264 MOV's streams into an MP4 without re-encoding video. Returns False if the video must be re-encoded."""
+    video_codec, audio_codec = probe_codecs(video_path)
+    if video_codec != "h264":
+        return False
+    # Copy audio the MP4 container accepts as-is; transcode only codecs it cannot hold, such as PCM
+    audio_mode = "copy" if audio_codec is None or audio_codec in MP4_AUDIO_CODECS else "aac"
+    try:
+        subprocess.run(
+            [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-i", video_path,
+             "-c:v", "copy", "-c:a", audio_mode, "-movflags", "+faststart", mp4_path],
+            check=True,
+            capture_output=True,
+        )
+        return True
+    except (OSError, subprocess.CalledProcessError) as e:
+        log_message(f"Error remuxing {video_path}, re-encoding instead: {e}", log_directory=log_directory)
+        return False
+
 def convert_mov_to_mp4(video_path, originals_folder, log_directory):
     """Convert a MOV video to MP4 format and move the original MOV file to the 'ORIGINALS' folder."""
     try:
         mp4_path = os.path.splitext(video_path)[0] + ".mp4"
-        clip = VideoFileClip(video_path)
-        clip.write_videofile(mp4_path, codec="libx264", audio_codec="aac")
+        if not remux_mov_to_mp4(video_path, mp4_path, log_directory):
+            # Close the clip's ffmpeg reader before the source file is moved
+            with VideoFileClip(video_path) as clip:
+                clip.write_videofile(mp4_path, codec="libx264", audio_codec="aac", temp_audiofile=temp_audio_path(mp4_path), logger=None)
         move_to_originals(video_path, originals_folder, log_directory)
         log_message(f"Converted {video_path} to {mp4_path} and moved original MOV to {originals_folder}", log_directory=log_directory)
         return mp4_path
@@ -92,148 +307,289 @@ def compress_mp4(video_path, originals_folder, log_directory, quality=JPEG_QUALI
     """Compress an existing MP4 video file."""
     try:
         compressed_path = os.path.splitext(video_path)[0] + "_compressed.mp4"
-        clip = VideoFileClip(video_path)
-        clip.write_videofile(compressed_path, codec="libx264", audio_codec="aac", bitrate="500k")
+        with VideoFileClip(video_path) as clip:
+            clip.write_videofile(compressed_path, codec="libx264", audio_codec="aac", bitrate="500k", temp_audiofile=temp_audio_path(compressed_path), logger=None)
         log_message(f"Compressed {video_path} to {compressed_path}", log_directory=log_directory)
         return compressed_path
     except Exception as e:
         log_message(f"Error compressing {video_path}: {e}", log_directory=log_directory)
         return None
 
+def frame_to_display_array(frame):
+    """Convert a decoded frame to an RGB array at caption resolution, rotated upright from its display matrix as ffmpeg would."""
+    # Scale down while decoding so queued frames stay small regardless of the source resolution
+    image = frame.reformat(width=CAPTION_FRAME_SIZE, height=CAPTION_FRAME_SIZE, format="rgb24").to_ndarray()
+    # PyAV reports the counterclockwise rotation needed for display; older versions do not expose it
+    quarter_turns = round((getattr(frame, "rotation", 0) or 0) / 90) % 4
+    if quarter_turns:
+        image = np.ascontiguousarray(np.rot90(image, k=quarter_turns))
+    return image
+
 def extract_keyframes(video_path):
     """Extract the first, middle, and last frames from a video file."""
     try:
-        clip = VideoFileClip(video_path)
-        duration = clip.duration
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            if stream.duration is not None:
+                duration = float(stream.duration * stream.time_base)
+            else:
+                duration = container.duration / av.time_base
+            start_pts = stream.start_time or 0
+            start_time = float(start_pts * stream.time_base)
 
-        # Extract keyframes (first, middle, last)
-        first_frame = clip.get_frame(0)
-        middle_frame = clip.get_frame(duration / 2)
-        last_frame = clip.get_frame(duration - 1)
-
-        return [first_frame, middle_frame, last_frame]
+            keyframes = []
+            for timestamp in (0, duration / 2, max(duration - 1, 0)):
+                # Seeking lands on the preceding keyframe, so decode forward to the requested time,
+                # falling back to the last frame decoded if the stream ends first. Frames without a
+                # timestamp cannot be placed, so take the first one instead of decoding to the end.
+                container.seek(start_pts + int(timestamp / stream.time_base), stream=stream)
+                frame = None
+                for frame in container.decode(stream):
+                    if frame.time is None or frame.time >= start_time + timestamp:
+                        break
+                if frame is not None:
+                    keyframes.append(frame_to_display_array(frame))
+            return keyframes
     except Exception as e:
         log_message(f"Error extracting keyframes from {video_path}: {e}", log_directory=os.path.dirname(video_path))
         return []
 
-def generate_caption_for_frame(frame, log_directory):
-    """Generate a caption for a single video frame using the BLIP model."""
-    try:
-        image = Image.fromarray(frame)
-        inputs = processor(images=image, return_tensors="pt")
-        out = model.generate(**inputs)
-        caption = processor.decode(out[0], skip_special_tokens=True)
-        return caption.strip()
-    except Exception as e:
-        log_message(f"Error generating caption for frame: {e}", log_directory=log_directory)
-        return ""
+def generate_captions_for_frames(frames, log_directory):
+    """Generate captions for a list of video frames, running BLIP on mini-batches of CAPTION_BATCH_SIZE frames."""
+    processor, model = get_blip()
+    captions = []
+    for start in range(0, len(frames), CAPTION_BATCH_SIZE):
+        batch = frames[start:start + CAPTION_BATCH_SIZE]
+        try:
+            images = [Image.fromarray(frame) for frame in batch]
+            inputs = processor(images=images, return_tensors="pt").to(device, dtype)
+            with torch.inference_mode():
+                out = model.generate(**inputs, num_beams=1, do_sample=False, max_new_tokens=CAPTION_MAX_NEW_TOKENS)
+            decoded = processor.batch_decode(out, skip_special_tokens=True)
+            captions.extend(caption.strip() for caption in decoded)
+        except Exception as e:
+            log_message(f"Error generating captions for frames: {e}", log_directory=log_directory)
+            captions.extend("" for _ in batch)
+    return captions
+
+def scan_files(directory):
+    """Recursively yield (root, entry) for each file under a directory, reusing the type and stat data os.scandir caches."""
+    pending_dirs = [directory]
+    while pending_dirs:
+        root = pending_dirs.pop()
+        try:
+            # Materialize each listing so files renamed mid-pass are not seen twice
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    pending_dirs.append(entry.path)
+            else:
+                yield root, entry
 
-def generate_combined_caption(video_path, log_directory):
-    """Generate a combined caption from the first, middle, and last frames of the video."""
-    keyframes = extract_keyframes(video_path)
-    captions = [generate_caption_for_frame(frame, log_directory) for frame in keyframes if frame is not None]
-    return " ".join(captions)
+def get_directory_listing(directory_listings, directory):
+    """Return a cached snapshot of a directory's filenames, normalized for the platform's case sensitivity."""
+    if directory not in directory_listings:
+        directory_listings[directory] = {os.path.normcase(name) for name in os.listdir(directory)}
+    return directory_listings[directory]
 
-def resolve_conflict(directory, base_name, fileext):
-    """Resolve naming conflicts by appending a numeric suffix to the base name."""
+def resolve_conflict(directory_listings, directory, base_name, fileext):
+    """Resolve naming conflicts by appending a numeric suffix to the base name, probing a cached directory listing."""
+    existing_names = get_directory_listing(directory_listings, directory)
     counter = 1
-    while True:
-        new_filename = f"{base_name}{counter:03d}{fileext}"
-        if not os.path.exists(os.path.join(directory, new_filename)):
-            return new_filename
+    while os.path.normcase(f"{base_name}{counter:03d}{fileext}") in existing_names:
         counter += 1
+    new_filename = f"{base_name}{counter:03d}{fileext}"
+    existing_names.add(os.path.normcase(new_filename))
+    return new_filename
+
+@dataclass
+class Videos:
+    """Per-video state for one processing run, stored as parallel lists indexed by video."""
+    paths: list = field(default_factory=list)
+    exts: list = field(default_factory=list)
+    mtimes: list = field(default_factory=list)
+    skip_flags: list = field(default_factory=list)
+
+def scan_videos(directory):
+    """Walk the directory once and record every supported video for the processing passes."""
+    videos = Videos()
+    for root, entry in scan_files(directory):
+        fileext = os.path.splitext(entry.name)[1].lower()
+        if fileext in SUPPORTED_EXTENSIONS:
+            stat = entry.stat()
+            videos.paths.append(entry.path)
+            videos.exts.append(fileext)
+            videos.mtimes.append(stat.st_mtime)
+            # Skip files in the ORIGINALS and DUPLICATES folders
+            videos.skip_flags.append("ORIGINALS" in root or "DUPLICATES" in root)
+    return videos
+
+def convert_mov_files(videos, originals_folder, log_directory):
+    """Convert all MOV files to MP4 in parallel while preserving the original MOV files."""
+    indices = [i for i in range(len(videos.paths)) if not videos.skip_flags[i] and videos.exts[i] == ".mov"]
+
+    convert = functools.partial(convert_mov_to_mp4, originals_folder=originals_folder, log_directory=log_directory)
+    with ThreadPoolExecutor(max_workers=MAX_ENCODE_WORKERS) as pool:
+        mp4_paths = list(pool.map(convert, [videos.paths[i] for i in indices]))
+
+    # Point converted entries at their MP4, keeping the MOV's modification date for the date pass
+    path_indices = {path: i for i, path in enumerate(videos.paths)}
+    for i, mp4_path in zip(indices, mp4_paths):
+        if mp4_path:
+            # An MP4 that already sat next to the MOV was overwritten by the conversion
+            overwritten = path_indices.get(mp4_path)
+            if overwritten is not None:
+                videos.skip_flags[overwritten] = True
+            videos.paths[i] = mp4_path
+            videos.exts[i] = ".mp4"
+
+def rename_video_from_caption(video_path, caption, directory_listings, originals_folder, log_directory):
+    """Rename a video file to the PascalCase form of its caption and return its new path."""
+    root, file = os.path.split(video_path)
+    fileext = os.path.splitext(file)[1].lower()
+    pascal_case_name = "".join(
+        word.capitalize() for word in caption.split()
+    )[:47]
+    new_name = resolve_conflict(directory_listings, root, pascal_case_name, fileext)
+    try:
+        os.rename(video_path, os.path.join(root, new_name))
+        move_to_originals(video_path, originals_folder, log_directory)
+        return os.path.join(root, new_name)
+    except Exception as e:
+        log_message(f"Error renaming {file} to {new_name}: {e}", log_directory=log_directory)
+        return None
+
+def caption_pending_frames(pending, videos, directory_listings, originals_folder, log_directory):
+    """Caption a queue of (video index, frame) pairs and rename each video from its combined caption."""
+    captions = generate_captions_for_frames([frame for _, frame in pending], log_directory)
+    video_captions = {}
+    for (i, _), caption in zip(pending, captions):
+        if caption:
+            video_captions.setdefault(i, []).append(caption)
+    for i, frame_captions in video_captions.items():
+        new_path = rename_video_from_caption(videos.paths[i], " ".join(frame_captions), directory_listings, originals_folder, log_directory)
+        if new_path:
+            videos.paths[i] = new_path
+
+def generate_captions(videos, originals_folder, log_directory):
+    """Generate captions for all videos, batching keyframes across videos."""
+    indices = [i for i in range(len(videos.paths)) if not videos.skip_flags[i]]
+
+    # Decode keyframes on worker threads, keeping at most CAPTION_BATCH_SIZE videos in flight ahead of captioning
+    pending = []
+    directory_listings = {}
+    remaining_indices = iter(indices)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        extractions = deque(
+            (i, pool.submit(extract_keyframes, videos.paths[i]))
+            for i in itertools.islice(remaining_indices, CAPTION_BATCH_SIZE)
+        )
+        while extractions:
+            i, extraction = extractions.popleft()
+            next_index = next(remaining_indices, None)
+            if next_index is not None:
+                extractions.append((next_index, pool.submit(extract_keyframes, videos.paths[next_index])))
+
+            # Queue keyframes until the next video would overflow a batch, then caption and rename the queued videos together
+            keyframes = [frame for frame in extraction.result() if frame is not None]
+            if pending and len(pending) + len(keyframes) > CAPTION_BATCH_SIZE:
+                caption_pending_frames(pending, videos, directory_listings, originals_folder, log_directory)
+                pending = []
+            pending.extend((i, frame) for frame in keyframes)
+    if pending:
+        caption_pending_frames(pending, videos, directory_listings, originals_folder, log_directory)
 
-def convert_mov_files(directory, originals_folder, log_directory):
-    """Convert all MOV files in the directory to MP4 while preserving the original MOV files."""
-    for root, _, files in os.walk(directory):
-        for file in files:
-            fileext = os.path.splitext(file)[1].lower()
-            if fileext == ".mov":
-                video_path = os.path.join(root, file)
-                convert_mov_to_mp4(video_path, originals_folder, log_directory)
-
-def generate_captions(directory, originals_folder, log_directory):
-    """Generate captions for all video files in the directory."""
-    for root, _, files in os.walk(directory):
-        for file in files:
-            fileext = os.path.splitext(file)[1].lower()
-            if fileext in SUPPORTED_EXTENSIONS:
-                video_path = os.path.join(root, file)
-                # Skip files in the ORIGINALS folder
-                if "ORIGINALS" in root or "DUPLICATES" in root:
-                    continue
-                caption = generate_combined_caption(video_path, log_directory)
-                if caption:
-                    pascal_case_name = "".join(
-                        word.capitalize() for word in caption.split()
-                    )[:47]
-                    new_name = resolve_conflict(root, pascal_case_name, fileext)
-                    try:
-                        os.rename(video_path, os.path.join(root, new_name))
-                        move_to_originals(video_path, originals_folder, log_directory)
-                    except Exception as e:
-                        log_message(f"Error renaming {file} to {new_name}: {e}", log_directory=log_directory)
-
-def prepend_dates_to_filenames(directory, originals_folder, log_directory):
+def prepend_dates_to_filenames(videos, originals_folder, log_directory):
     """Prepend the date taken to the filenames based on the file's modification date."""
-    for root, _, files in os.walk(directory):
-        for file in files:
-            fileext = os.path.splitext(file)[1].lower()
-            if fileext in SUPPORTED_EXTENSIONS:
-                video_path = os.path.join(root, file)
-                # Skip files in the ORIGINALS and DUPLICATES folders
-                if "ORIGINALS" in root or "DUPLICATES" in root:
-                    continue
-                # Use the file's modification date as a proxy for the video date
-                date_taken = datetime.fromtimestamp(os.path.getmtime(video_path)).strftime('%Y-%m-%d')
-                if date_taken and not re.match(r'^\d{4}-\d{2}-\d{2}_', file):
-                    new_name = f"{date_taken}_{file}"
-                    new_path = os.path.join(root, new_name)
-                    try:
-                        os.rename(video_path, new_path)
-                        move_to_originals(video_path, originals_folder, log_directory)
-                    except Exception as e:
-                        log_message(f"Error renaming {file} to {new_name}: {e}", log_directory=log_directory)
-
-def compress_videos(directory, originals_folder, log_directory):
-    """Compress all MP4 files in the directory while preserving quality."""
-    for root, _, files in os.walk(directory):
-        for file in files:
-            fileext = os.path.splitext(file)[1].lower()
-            if fileext == ".mp4" and "_compressed" not in file.lower():
-                video_path = os.path.join(root, file)
-                # Skip files in the ORIGINALS and DUPLICATES folders
-                if "ORIGINALS" in root or "DUPLICATES" in root:
-                    continue
-                compressed_video_path = compress_mp4(video_path, originals_folder, log_directory)
-                if compressed_video_path:
-                    move_to_originals(video_path, originals_folder, log_directory)
+    for i in range(len(videos.paths)):
+        if videos.skip_flags[i]:
+            continue
+        video_path = videos.paths[i]
+        root, file = os.path.split(video_path)
+        # Use the file's modification date as a proxy for the video date
+        date_taken = datetime.fromtimestamp(videos.mtimes[i]).strftime('%Y-%m-%d')
+        if date_taken and not re.match(r'^\d{4}-\d{2}-\d{2}_', file):
+            new_name = f"{date_taken}_{file}"
+            new_path = os.path.join(root, new_name)
+            try:
+                os.rename(video_path, new_path)
+                videos.paths[i] = new_path
+                move_to_originals(video_path, originals_folder, log_directory)
+            except Exception as e:
+                log_message(f"Error renaming {file} to {new_name}: {e}", log_directory=log_directory)
+
+def compress_and_archive(video_path, originals_folder, log_directory):
+    """Compress an MP4 file and move the uncompressed original to the 'ORIGINALS' folder."""
+    compressed_video_path = compress_mp4(video_path, originals_folder, log_directory)
+    if compressed_video_path:
+        move_to_originals(video_path, originals_folder, log_directory)
+
+def compress_videos(videos, originals_folder, log_directory):
+    """Compress all MP4 files in parallel while preserving quality."""
+    video_paths = [
+        videos.paths[i] for i in range(len(videos.paths))
+        if not videos.skip_flags[i]
+        and videos.exts[i] == ".mp4"
+        and "_compressed" not in os.path.basename(videos.paths[i]).lower()
+    ]
+
+    compress = functools.partial(compress_and_archive, originals_folder=originals_folder, log_directory=log_directory)
+    with ThreadPoolExecutor(max_workers=MAX_ENCODE_WORKERS) as pool:
+        list(pool.map(compress, video_paths))
 
 def process_videos(directory, prepend_date=False, compress=False):
     """Process video files in the specified directory by running them through multiple passes."""
     
     originals_folder = create_originals_folder(directory)
     log_directory = directory
+
+    # Walk the directory once; every pass works from and updates this table
+    videos = scan_videos(directory)
     
     # Pass 1: Convert MOV to MP4
-    convert_mov_files(directory, originals_folder, log_directory)
+    convert_mov_files(videos, originals_folder, log_directory)
 
     # Pass 2: Generate captions
-    generate_captions(directory, originals_folder, log_directory)
+    generate_captions(videos, originals_folder, log_directory)
 
     # Pass 3: Prepend dates to filenames
     if prepend_date:
-        prepend_dates_to_filenames(directory, originals_folder, log_directory)
+        prepend_dates_to_filenames(videos, originals_folder, log_directory)
 
     # Pass 4: Compress MP4 files
     if compress:
-        compress_videos(directory, originals_folder, log_directory)
+        compress_videos(videos, originals_folder, log_directory)
 
 if __name__ == "__main__":
     # Check for command-line arguments
     prepend_date = "--DATE" in sys.argv
     compress = "--COMPRESS" in sys.argv
 
+    if "--DAEMON" in sys.argv:
+        # Load the model once, then process each directory path read from stdin until EOF
+        get_blip()
+        for line in sys.stdin:
+            directory = line.strip()
+            if not directory:
+                continue
+            if not os.path.isdir(directory):
+                print(f"Error: The provided directory '{directory}' does not exist.", flush=True)
+                continue
+            # Report a failed directory and keep serving the rest instead of ending the worker
+            try:
+                process_videos(directory, prepend_date, compress)
+            except Exception as e:
+                print(f"Error: Failed to process '{directory}': {e}", flush=True)
+                continue
+            finally:
+                close_loggers()
+            print(f"Processed {directory}", flush=True)
+        sys.exit(0)
+
     # Get the directory from the command-line argument if provided
     if len(sys.argv) > 1:
         directory = sys.argv[1]
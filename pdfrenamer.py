@@ -1,38 +1,85 @@
 import os
 import sys
 import re
+import queue
+import logging
+import functools
+import threading
 import unicodedata
 import uuid
-from datetime import datetime
-from PyPDF2 import PdfReader
+from collections import OrderedDict
+import torch
+import pypdfium2 as pdfium
 from transformers import pipeline, AutoTokenizer
 
-# Initialize the summarization model and tokenizer with a specified model
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
+# Number of PDFs summarized per model call, and how many extracted PDFs the reader thread may hold ahead
+SUMMARY_BATCH_SIZE = 8
+PREFETCH_QUEUE_SIZE = SUMMARY_BATCH_SIZE
+
+# PDFs whose cleaned title has at least this many words are named from the title without summarizing
+MIN_TITLE_WORDS = 3
+
+# Guards the directory listings shared by the reader thread and the summarizer
+listing_lock = threading.Lock()
+
+LOG_FILENAME = "PDFRenamer_Log.txt"
+# One logger per log directory, each keeping its log file open between messages; only the
+# MAX_OPEN_LOGS most recently used directories keep a file open
+MAX_OPEN_LOGS = 16
+loggers = OrderedDict()
+loggers_lock = threading.Lock()
+
+# Regular expressions used on every file, compiled once
+GUID_PATTERN = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+DATE_LABEL_PATTERN = re.compile(r'\bDate:\b', re.IGNORECASE)
+DATE_PATTERN = re.compile(r'\b(?:\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{4}[-/]\d{1,2}[-/]\d{1,2})\b')
+SPECIAL_CHARACTERS_PATTERN = re.compile(r'[^A-Za-z0-9\s]')
+FILENAME_CHARACTERS_PATTERN = re.compile(r'[^A-Za-z0-9\.\-_]')
+# Titles written by exporters rather than authors, e.g. "Microsoft Word - Report.docx" or "Slides.pptx"
+BOILERPLATE_TITLE_PATTERN = re.compile(
+    r'^\s*(?:Microsoft\s+(?:Word|Excel|PowerPoint|Publisher|Visio)\b|untitled\b|document\s*\d*\s*$)'
+    r'|\.(?:docx?|xlsx?|pptx?|odt|ods|odp|rtf|txt|pdf|html?|pages|key)\s*$',
+    re.IGNORECASE,
+)
+
+@functools.lru_cache(maxsize=1)
+def get_summarizer():
+    # Initialize the summarization model and tokenizer on first use, in half precision on the GPU when available
+    if torch.cuda.is_available():
+        summarizer = pipeline("summarization", model="facebook/bart-large-cnn", device=0, torch_dtype=torch.float16)
+    else:
+        summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+    tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
+    return summarizer, tokenizer
 
 def contains_guid(filename):
-    # Regular expression pattern to match a GUID/UUID
-    pattern = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
-    match = pattern.search(filename)
+    # Match a GUID/UUID anywhere in the filename
+    match = GUID_PATTERN.search(filename)
     return match is not None
 
+def is_descriptive_title(title, cleaned_title):
+    # A title can replace summarization only if it has MIN_TITLE_WORDS words and is not exporter boilerplate
+    if BOILERPLATE_TITLE_PATTERN.search(title):
+        return False
+    return len(cleaned_title.split()) >= MIN_TITLE_WORDS
+
 def extract_text_and_metadata_from_pdf(file_path):
     text = ""
     title = ""
     description = ""
     try:
-        reader = PdfReader(file_path)
-        
-        # Extract text content from each page
-        for page in reader.pages:
-            text += page.extract_text()
-
-        # Extract metadata if available
-        metadata = reader.metadata
-        
-        title = metadata.get('/Title', '') if metadata else ''
-        description = metadata.get('/Subject', '') if metadata else ''  # /Subject is often used as a description field
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            # Extract text content from each page with PDFium's native text layer
+            text = "\n".join(page.get_textpage().get_text_range() for page in pdf)
+
+            # Extract metadata if available
+            metadata = pdf.get_metadata_dict()
+        finally:
+            pdf.close()
+
+        title = metadata.get('Title', '')
+        description = metadata.get('Subject', '')  # Subject is often used as a description field
 
         return text.strip(), title.strip(), description.strip()
 
@@ -42,67 +89,172 @@ def extract_text_and_metadata_from_pdf(file_path):
 
 def remove_special_characters(text):
     # Remove all characters except letters, numbers, and spaces
-    cleaned_text = re.sub(r'[^A-Za-z0-9\s]', '', text)
+    cleaned_text = SPECIAL_CHARACTERS_PATTERN.sub('', text)
     return cleaned_text
 
 def ignore_dates(text):
     # Remove "Date:" or "date:" (case-insensitive) and date-like patterns (e.g., 2023-08-14, 14/08/2023)
-    cleaned_text = re.sub(r'\bDate:\b', '', text, flags=re.IGNORECASE)
-    cleaned_text = re.sub(r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b', '', cleaned_text)
-    cleaned_text = re.sub(r'\b\d{4}[-/]\d{1,2}[-/]\d{1,2}\b', '', cleaned_text)
+    cleaned_text = DATE_LABEL_PATTERN.sub('', text)
+    cleaned_text = DATE_PATTERN.sub('', cleaned_text)
     return cleaned_text
 
-def resolve_conflict(directory, base_name, fileext):
-    counter = 1
-    while True:
+def get_directory_listing(directory_listings, directory):
+    # Snapshot a directory's filenames once, normalized for the platform's case sensitivity
+    if directory not in directory_listings:
+        directory_listings[directory] = {os.path.normcase(name) for name in os.listdir(directory)}
+    return directory_listings[directory]
+
+def record_filename(directory_listings, directory, filename):
+    # Add a name created outside resolve_conflict to the directory's snapshot, if one has been taken
+    with listing_lock:
+        if directory in directory_listings:
+            directory_listings[directory].add(os.path.normcase(filename))
+
+def resolve_conflict(directory_listings, directory, base_name, fileext):
+    # Probe the cached listing instead of the disk; the lock keeps the reader and summarizer threads from claiming the same name
+    with listing_lock:
+        existing_names = get_directory_listing(directory_listings, directory)
+        counter = 1
+        while os.path.normcase(f"{base_name}{counter:03d}{fileext}") in existing_names:
+            counter += 1
         new_filename = f"{base_name}{counter:03d}{fileext}"
-        if not os.path.exists(os.path.join(directory, new_filename)):
-            return new_filename
-        counter += 1
+        existing_names.add(os.path.normcase(new_filename))
+        return new_filename
 
 def normalize_filename(filename):
     # Normalize the filename by converting non-standard characters to ASCII and removing others
     normalized_filename = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
-    normalized_filename = re.sub(r'[^A-Za-z0-9\.\-_]', '', normalized_filename)  # Keep alphanumeric, dot, hyphen, and underscore
+    normalized_filename = FILENAME_CHARACTERS_PATTERN.sub('', normalized_filename)  # Keep alphanumeric, dot, hyphen, and underscore
     return normalized_filename
 
+def close_logger(logger):
+    # Flush and close a logger's log file; callers hold loggers_lock
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+
+def get_logger(log_directory):
+    # Return the directory's logger, keeping at most MAX_OPEN_LOGS log files open; callers hold loggers_lock
+    log_path = os.path.abspath(os.path.join(log_directory, LOG_FILENAME))
+    if log_path in loggers:
+        loggers.move_to_end(log_path)
+        return loggers[log_path]
+    # Close the least recently used log file so large trees do not exhaust file descriptors
+    if len(loggers) >= MAX_OPEN_LOGS:
+        _, oldest_logger = loggers.popitem(last=False)
+        close_logger(oldest_logger)
+    logger = logging.getLogger(f"PDFRenamer:{log_path}")
+    handler = logging.FileHandler(log_path, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    loggers[log_path] = logger
+    return logger
+
+def close_loggers():
+    # Flush and close every open log file
+    with loggers_lock:
+        for logger in loggers.values():
+            close_logger(logger)
+        loggers.clear()
+
 def log_message(message, log_directory):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_filename = "PDFRenamer_Log.txt"
-    log_path = os.path.join(log_directory, log_filename)
-    
-    with open(log_path, "a", encoding="utf-8") as log_file:
-        log_file.write(f"[{timestamp}] {message}\n")
+    # Hold the lock while writing so another thread cannot close this log file mid-message
+    with loggers_lock:
+        get_logger(log_directory).info(message)
 
-def truncate_text_to_max_tokens(text, max_length):
-    # Tokenize the text
-    tokens = tokenizer(text, truncation=True, max_length=max_length, return_tensors='pt')
-    
-    # Decode back to string
-    truncated_text = tokenizer.decode(tokens['input_ids'][0], skip_special_tokens=True)
-    
-    return truncated_text
+def generate_summaries(texts):
+    summarizer, tokenizer = get_summarizer()
+
+    # Tokenize once, truncating to the model's maximum token length, and hand the ids straight to the model
+    inputs = tokenizer(texts, truncation=True, max_length=1024, padding=True, return_tensors='pt').to(summarizer.device)
+    with torch.inference_mode():
+        output_ids = summarizer.model.generate(**inputs, max_length=40, min_length=25, num_beams=1, do_sample=False)
+
+    # Decode the generated ids back to summary strings
+    return [summary.strip() for summary in tokenizer.batch_decode(output_ids, skip_special_tokens=True)]
 
 def summarize_content(text, log_dir):
     try:
-        # Truncate text to fit within the model's maximum token length
-        truncated_text = truncate_text_to_max_tokens(text, 1024)
-        
-        # Summarize the truncated text
-        summary = summarizer(truncated_text, max_length=60, min_length=25, do_sample=False)
-        return summary[0]['summary_text'].strip()
+        return generate_summaries([text])[0]
     except Exception as e:
         log_message(f"Error summarizing content: {e}", log_dir)
         return ""
 
-def rename_untitled_file(root, file):
+def summarize_contents(texts, log_dirs):
+    # Each text is logged to its own PDF's directory, given by the matching entry of log_dirs
+    try:
+        # Summarize the whole batch in one model call
+        return generate_summaries(texts)
+    except Exception as e:
+        # Fall back to one text at a time so a single bad document does not lose the whole batch
+        for log_dir in dict.fromkeys(log_dirs):
+            log_message(f"Error summarizing batch, retrying individually: {e}", log_dir)
+        return [summarize_content(text, log_dir) for text, log_dir in zip(texts, log_dirs)]
+
+def rename_untitled_file(root, file, directory_listings):
     base_name = "Document"
     fileext = ".pdf"
-    new_name = resolve_conflict(root, base_name, fileext)
+    new_name = resolve_conflict(directory_listings, root, base_name, fileext)
     os.rename(os.path.join(root, file), os.path.join(root, new_name))
     log_message(f"Renamed untitled file {file} to {new_name}", root)
     return new_name
 
+def read_pdfs(directory, pdf_queue, directory_listings, stop_reading):
+    # Normalize filenames and extract cleaned text for each GUID-named PDF, queueing them ahead of summarization
+    try:
+        for root, _, files in os.walk(directory):
+            for file in files:
+                # Stop early if the summarizing thread has given up on this directory
+                if stop_reading.is_set():
+                    return
+                if file.lower().endswith(".pdf"):
+                    # Normalize the filename and rename the file if necessary
+                    normalized_file_name = normalize_filename(file)
+                    original_file_path = os.path.join(root, file)
+                    normalized_file_path = os.path.join(root, normalized_file_name)
+
+                    if original_file_path != normalized_file_path:
+                        os.rename(original_file_path, normalized_file_path)
+                        record_filename(directory_listings, root, normalized_file_name)
+                        log_message(f"Renamed {file} to {normalized_file_name}", root)
+
+                    # Handle "Untitled" files
+                    if normalized_file_name.lower().startswith("untitled"):
+                        normalized_file_name = rename_untitled_file(root, normalized_file_name, directory_listings)
+
+                    # Continue with the normalized file name
+                    file_name = os.path.splitext(normalized_file_name)[0]
+                    if contains_guid(file_name):
+                        pdf_path = os.path.join(root, normalized_file_name)
+
+                        # Extract text and metadata from PDF
+                        pdf_text, pdf_title, pdf_description = extract_text_and_metadata_from_pdf(pdf_path)
+
+                        # Ignore dates in text, title, and description
+                        pdf_text = ignore_dates(pdf_text)
+                        pdf_title = ignore_dates(pdf_title)
+                        pdf_description = ignore_dates(pdf_description)
+
+                        # Remove special characters
+                        cleaned_text = remove_special_characters(pdf_text)
+                        cleaned_title = remove_special_characters(pdf_title)
+                        cleaned_description = remove_special_characters(pdf_description)
+
+                        # Combine cleaned text, title, and description
+                        combined_text = f"{cleaned_title} {cleaned_description} {cleaned_text}".strip()
+
+                        # Use a descriptive title directly so only PDFs without one go through the summarizer
+                        title_summary = cleaned_title.strip() if is_descriptive_title(pdf_title, cleaned_title) else ""
+
+                        pdf_queue.put((root, file, pdf_path, title_summary, combined_text))
+    except Exception as e:
+        # Hand the error to the summarizing thread so it is raised there
+        pdf_queue.put(e)
+    finally:
+        pdf_queue.put(None)
+
 def process_pdfs(directory):
     # Check if any supported PDF files exist in the directory
     files_exist = any(
@@ -114,67 +266,88 @@ def process_pdfs(directory):
         print("No PDF files found with supported extensions.")
         return  # Exit the function if no matching files are found
 
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.lower().endswith(".pdf"):
-                # Normalize the filename and rename the file if necessary
-                normalized_file_name = normalize_filename(file)
-                original_file_path = os.path.join(root, file)
-                normalized_file_path = os.path.join(root, normalized_file_name)
-
-                if original_file_path != normalized_file_path:
-                    os.rename(original_file_path, normalized_file_path)
-                    log_message(f"Renamed {file} to {normalized_file_name}", root)
-
-                # Handle "Untitled" files
-                if normalized_file_name.lower().startswith("untitled"):
-                    normalized_file_name = rename_untitled_file(root, normalized_file_name)
-
-                # Continue with the normalized file name
-                file_name = os.path.splitext(normalized_file_name)[0]
-                if contains_guid(file_name):
-                    pdf_path = os.path.join(root, normalized_file_name)
-                    fileext = ".pdf"
-
-                    # Extract text and metadata from PDF
-                    pdf_text, pdf_title, pdf_description = extract_text_and_metadata_from_pdf(pdf_path)
-
-                    # Ignore dates in text, title, and description
-                    pdf_text = ignore_dates(pdf_text)
-                    pdf_title = ignore_dates(pdf_title)
-                    pdf_description = ignore_dates(pdf_description)
-
-                    # Remove special characters
-                    cleaned_text = remove_special_characters(pdf_text)
-                    cleaned_title = remove_special_characters(pdf_title)
-                    cleaned_description = remove_special_characters(pdf_description)
-
-                    # Combine cleaned text, title, and description
-                    combined_text = f"{cleaned_title} {cleaned_description} {cleaned_text}".strip()
-
-                    # Log the entire combined text before summarization
+    # Read and clean PDFs on a background thread so disk I/O overlaps with summarization
+    pdf_queue = queue.Queue(maxsize=PREFETCH_QUEUE_SIZE)
+    directory_listings = {}
+    stop_reading = threading.Event()
+    threading.Thread(
+        target=read_pdfs, args=(directory, pdf_queue, directory_listings, stop_reading), daemon=True
+    ).start()
+
+    finished = False
+    try:
+        while not finished:
+            # Collect up to SUMMARY_BATCH_SIZE PDFs from the reader thread
+            batch = []
+            while len(batch) < SUMMARY_BATCH_SIZE:
+                item = pdf_queue.get()
+                if item is None:
+                    finished = True
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                root, file, pdf_path, title_summary, combined_text = item
+                # Log the entire combined text of PDFs that will be summarized
+                if not title_summary:
                     log_message(f"Combined text before summarization for {file}: {combined_text}", root)
+                batch.append(item)
+
+            if not batch:
+                break
 
-                    # Summarize the content
-                    summary = summarize_content(combined_text, root)
-                    log_message(f"Summary for {file}: {summary}", root)
+            # Summarize the content of PDFs that have no descriptive title
+            texts_to_summarize = [combined_text for _, _, _, title_summary, combined_text in batch if not title_summary]
+            summary_roots = [root for root, _, _, title_summary, _ in batch if not title_summary]
+            summaries = iter(summarize_contents(texts_to_summarize, summary_roots) if texts_to_summarize else [])
 
-                    # Convert the summary to PascalCase and truncate to 47 characters
-                    pascal_case_name = "".join(
-                        word.capitalize() for word in summary.split()
-                    )[:47]  # Truncate to 47 characters
+            for root, file, pdf_path, title_summary, _ in batch:
+                fileext = ".pdf"
+                summary = title_summary or next(summaries)
+                log_message(f"Summary for {file}: {summary}", root)
 
-                    if pascal_case_name:
-                        base_name = pascal_case_name
-                        new_name = resolve_conflict(root, base_name, fileext)
-                        new_path = os.path.join(root, new_name)
-                        os.rename(pdf_path, new_path)
-                        log_message(f"Renamed {file} to {new_name}", root)
+                # Convert the summary to PascalCase and truncate to 47 characters
+                pascal_case_name = "".join(
+                    word.capitalize() for word in summary.split()
+                )[:47]  # Truncate to 47 characters
+
+                if pascal_case_name:
+                    base_name = pascal_case_name
+                    new_name = resolve_conflict(directory_listings, root, base_name, fileext)
+                    new_path = os.path.join(root, new_name)
+                    os.rename(pdf_path, new_path)
+                    log_message(f"Renamed {file} to {new_name}", root)
+    finally:
+        if not finished:
+            # Stop the reader thread and drain the queue so it is not left blocked on a full queue
+            stop_reading.set()
+            while pdf_queue.get() is not None:
+                pass
 
 if __name__ == "__main__":
     # Default to the current user's Downloads directory
     default_directory = os.path.join(os.path.expanduser("~"), "Downloads")
 
+    if "--DAEMON" in sys.argv:
+        # Load the model once, then process each directory path read from stdin until EOF
+        get_summarizer()
+        for line in sys.stdin:
+            directory = line.strip()
+            if not directory:
+                continue
+            if not os.path.isdir(directory):
+                print(f"Error: The provided directory '{directory}' does not exist.", flush=True)
+                continue
+            # Report a failed directory and keep serving the rest instead of ending the worker
+            try:
+                process_pdfs(directory)
+            except Exception as e:
+                print(f"Error: Failed to process '{directory}': {e}", flush=True)
+                continue
+            finally:
+                close_loggers()
+            print(f"Processed {directory}", flush=True)
+        sys.exit(0)
+
     # Get the directory from the command-line argument if provided
     if len(sys.argv) > 1:
         directory = sys.argv[1]